@@ -0,0 +1,5 @@
+import os
+
+# handlers.auth.auth reads these at import time
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("COGNITO_CLIENT_ID", "test-client-id")
@@ -1,8 +1,18 @@
+import hashlib
 import json
+import logging
 import os
-import boto3
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+except ImportError:  # Local dev without the Lambda layer
+    orjson = None
+
 # -----------------------------
 # Environment / Clients
 # -----------------------------
@@ -14,57 +24,235 @@ if not AWS_REGION:
 if not COGNITO_CLIENT_ID:
     raise RuntimeError("Missing required environment variable: COGNITO_CLIENT_ID")
 
-cognito = boto3.client("cognito-idp", region_name=AWS_REGION)
+logger = logging.getLogger(__name__)
+LOG_LEVEL = (os.environ.get("LOG_LEVEL") or "INFO").upper()
+if LOG_LEVEL in logging.getLevelNamesMapping():
+    logger.setLevel(LOG_LEVEL)
+else:
+    # A config typo shouldn't fail every invocation
+    logger.setLevel(logging.INFO)
+    logger.warning("Unknown LOG_LEVEL %r, falling back to INFO", LOG_LEVEL)
+
+
+@lru_cache(maxsize=1)
+def _get_cognito():
+    """Create the Cognito client on first use so bad requests skip importing boto3"""
+    import boto3
+    from botocore.config import Config
+
+    # One container serves one request at a time, so a single pooled keep-alive
+    # connection is enough; adaptive retries back off client-side on throttling.
+    config = Config(
+        region_name=AWS_REGION,
+        tcp_keepalive=True,
+        max_pool_connections=1,
+        retries={"mode": "adaptive", "max_attempts": 5},
+        connect_timeout=2,
+        read_timeout=5,
+    )
+    return boto3.client("cognito-idp", config=config)
+
 
 # -----------------------------
 # Helper Functions
 # -----------------------------
 
+if orjson:
+
+    def _dumps(body):
+        return orjson.dumps(body).decode()
+
+    _loads = orjson.loads
+else:
+
+    def _dumps(body):
+        return json.dumps(body, separators=(",", ":"))
+
+    _loads = json.loads
+
+
+# Shared by every response; API Gateway treats headers as read-only
+_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",  # Replace with your frontend domain in prod
+    "Access-Control-Allow-Headers": "Content-Type,Authorization",
+}
+
 
 def _response(status_code, body):
     """Standardized API Gateway response with CORS"""
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",  # Replace with your frontend domain in prod
-            "Access-Control-Allow-Headers": "Content-Type,Authorization",
-        },
-        "body": json.dumps(body),
-    }
+    return {"statusCode": status_code, "headers": _HEADERS, "body": _dumps(body)}
+
+
+# Static error responses are built once at import; API Gateway only reads them.
+_ERR_INVALID_JSON = _response(400, {"success": False, "error": "Invalid JSON body"})
+_ERR_INTERNAL = _response(500, {"success": False, "error": "Internal server error"})
+_ERR_INVALID_CREDS = _response(
+    401, {"success": False, "error": "Invalid username or password"}
+)
+_ERR_AUTH_FAILED = _response(400, {"success": False, "error": "Authentication failed"})
+_ERR_EMAIL_IN_USE = _response(400, {"success": False, "error": "Email already in use"})
+_ERR_SIGN_UP_FAILED = _response(400, {"success": False, "error": "Sign up failed"})
+_ERR_USER_NOT_FOUND = _response(404, {"success": False, "error": "User not found"})
+_ERR_INVALID_CONFIRMATION_CODE = _response(
+    400, {"success": False, "error": "Invalid confirmation code"}
+)
+_ERR_ALREADY_CONFIRMED = _response(
+    400, {"success": False, "error": "User already confirmed"}
+)
+_ERR_CONFIRMATION_FAILED = _response(
+    400, {"success": False, "error": "Confirmation failed"}
+)
+_ERR_EMAIL_NOT_FOUND = _response(404, {"success": False, "error": "Email not found"})
+_ERR_EMAIL_UNVERIFIED = _response(
+    400, {"success": False, "error": "Cannot reset password for unverified email"}
+)
+_ERR_RESET_FAILED = _response(400, {"success": False, "error": "Reset password failed"})
+_ERR_INVALID_VERIFICATION_CODE = _response(
+    400, {"success": False, "error": "Invalid verification code"}
+)
+_ERR_RESET_CONFIRMATION_FAILED = _response(
+    400, {"success": False, "error": "Password confirmation failed"}
+)
+_ERR_RATE_LIMITED = _response(
+    429, {"success": False, "error": "Too many requests, please try again shortly"}
+)
+
+# Success bodies that never vary are serialized once as well
+_OK_USER_CONFIRMED = _response(
+    200, {"success": True, "data": {"message": "User confirmed successfully"}}
+)
+_OK_RESET_INITIATED = _response(
+    200, {"success": True, "data": {"message": "Password reset initiated"}}
+)
+_OK_RESET_CONFIRMED = _response(
+    200, {"success": True, "data": {"message": "Password reset confirmed"}}
+)
+
+
+_CORS_PREFLIGHT = {
+    "statusCode": 204,
+    "headers": {**_HEADERS, "Access-Control-Allow-Methods": "OPTIONS,POST"},
+    "body": "",
+}
 
 
-def require_fields(body, *fields):
-    """Check for missing fields; returns a response dict if missing, else None"""
+def _missing_fields(body, *fields):
+    """400 response naming the missing fields; only called once a check has failed"""
     missing = [f for f in fields if not body.get(f)]
-    if missing:
-        return _response(
-            400,
-            {
-                "success": False,
-                "error": f"Missing required fields: {', '.join(missing)}",
-            },
-        )
-    return None
+    return _response(
+        400,
+        {
+            "success": False,
+            "error": f"Missing required fields: {', '.join(missing)}",
+        },
+    )
+
+
+class _TokenBucket:
+    """Per-container token bucket that sheds bursts before they reach Cognito"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+# Keyed on Cognito operation. A bucket passes at most capacity + rate * t calls
+# in any t seconds: sign-up stays within 20 per 10s (burst 10, refill 1/s); the
+# rest allow a burst of 5 refilling at 5/s.
+_COGNITO_LIMITS = {
+    "initiate_auth": _TokenBucket(rate=5, capacity=5),
+    "sign_up": _TokenBucket(rate=1, capacity=10),
+    "confirm_sign_up": _TokenBucket(rate=5, capacity=5),
+    "forgot_password": _TokenBucket(rate=5, capacity=5),
+    "confirm_forgot_password": _TokenBucket(rate=5, capacity=5),
+}
+
+
+# Only these event keys are logged; the body carries passwords and codes
+_LOGGED_EVENT_KEYS = ("routeKey", "rawPath", "rawQueryString")
+
+
+def _loggable_event(event):
+    """Event summary safe to write to CloudWatch"""
+    return {k: event[k] for k in _LOGGED_EVENT_KEYS if k in event}
 
 
 # -----------------------------
 # Cognito Auth Functions
 # -----------------------------
 
+# Only AuthParameters changes between sign-in calls
+_SIGN_IN_KWARGS = {"AuthFlow": "USER_PASSWORD_AUTH", "ClientId": COGNITO_CLIENT_ID}
+
+# Recently rejected credentials, as keyed digests -> monotonic expiry time.
+# Repeats within the TTL get a 401 without another Cognito round trip.
+# Confirming a sign-up or password reset clears only this container's cache;
+# other warm containers may still answer 401 for up to the TTL.
+_FAILED_SIGN_IN_TTL = 60
+_FAILED_SIGN_IN_MAX = 1024
+_FAILED_SIGN_IN_KEY = os.urandom(16)  # Per-container secret; digests stay unguessable
+_FAILED_SIGN_INS = OrderedDict()
+# NotAuthorizedException also covers disabled users; only cache a wrong password
+_INCORRECT_CREDENTIALS_MESSAGE = "Incorrect username or password."
+
+
+def _credentials_digest(username, password):
+    return hashlib.blake2b(
+        f"{username}\0{password}".encode(), key=_FAILED_SIGN_IN_KEY, digest_size=16
+    ).digest()
+
+
+def _recently_failed(digest):
+    expires = _FAILED_SIGN_INS.get(digest)
+    if expires is None:
+        return False
+    if expires > time.monotonic():
+        return True
+    del _FAILED_SIGN_INS[digest]
+    return False
+
+
+def _record_failed_sign_in(digest):
+    _FAILED_SIGN_INS[digest] = time.monotonic() + _FAILED_SIGN_IN_TTL
+    _FAILED_SIGN_INS.move_to_end(digest)
+    if len(_FAILED_SIGN_INS) > _FAILED_SIGN_IN_MAX:
+        _FAILED_SIGN_INS.popitem(last=False)
+
+
+# Cognito error code -> response; anything unlisted gets the route's default
+_SIGN_IN_ERRORS = {
+    "NotAuthorizedException": _ERR_INVALID_CREDS,
+    "UserNotFoundException": _ERR_INVALID_CREDS,
+}
+
 
 def sign_in(body):
-    resp = require_fields(body, "username", "password")
-    if resp:
-        return resp
+    username = body.get("username")
+    password = body.get("password")
+    if not username or not password:
+        return _missing_fields(body, "username", "password")
 
-    username = body["username"]
-    password = body["password"]
+    digest = _credentials_digest(username, password)
+    if _recently_failed(digest):
+        return _ERR_INVALID_CREDS
+    if not _COGNITO_LIMITS["initiate_auth"].try_acquire():
+        return _ERR_RATE_LIMITED
 
     try:
-        result = cognito.initiate_auth(
-            AuthFlow="USER_PASSWORD_AUTH",
-            ClientId=COGNITO_CLIENT_ID,
+        result = _get_cognito().initiate_auth(
+            **_SIGN_IN_KWARGS,
             AuthParameters={"USERNAME": username, "PASSWORD": password},
         ).get("AuthenticationResult", {})
 
@@ -82,26 +270,32 @@ def sign_in(body):
 
     except ClientError as e:
         code = e.response["Error"]["Code"]
-        print(f"Cognito sign_in error: {e}")
-        if code in ("NotAuthorizedException", "UserNotFoundException"):
-            return _response(
-                401, {"success": False, "error": "Invalid username or password"}
-            )
-        return _response(400, {"success": False, "error": "Authentication failed"})
+        logger.warning("Cognito sign_in error: %s", e)
+        if (
+            code == "NotAuthorizedException"
+            and e.response["Error"].get("Message") == _INCORRECT_CREDENTIALS_MESSAGE
+        ):
+            _record_failed_sign_in(digest)
+        return _SIGN_IN_ERRORS.get(code, _ERR_AUTH_FAILED)
 
 
-def sign_up(body):
-    resp = require_fields(body, "email", "password", "firstName", "lastName")
-    if resp:
-        return resp
+_SIGN_UP_ERRORS = {
+    "UsernameExistsException": _ERR_EMAIL_IN_USE,
+}
+
 
-    email = body["email"]
-    password = body["password"]
-    first_name = body["firstName"]
-    last_name = body["lastName"]
+def sign_up(body):
+    email = body.get("email")
+    password = body.get("password")
+    first_name = body.get("firstName")
+    last_name = body.get("lastName")
+    if not email or not password or not first_name or not last_name:
+        return _missing_fields(body, "email", "password", "firstName", "lastName")
+    if not _COGNITO_LIMITS["sign_up"].try_acquire():
+        return _ERR_RATE_LIMITED
 
     try:
-        result = cognito.sign_up(
+        result = _get_cognito().sign_up(
             ClientId=COGNITO_CLIENT_ID,
             Username=email,
             Password=password,
@@ -124,100 +318,92 @@ def sign_up(body):
 
     except ClientError as e:
         code = e.response["Error"]["Code"]
-        print(f"Cognito sign_up error: {e}")
-        if code == "UsernameExistsException":
-            return _response(400, {"success": False, "error": "Email already in use"})
-        return _response(400, {"success": False, "error": "Sign up failed"})
+        logger.warning("Cognito sign_up error: %s", e)
+        return _SIGN_UP_ERRORS.get(code, _ERR_SIGN_UP_FAILED)
 
 
-def confirm_sign_up(body):
-    resp = require_fields(body, "username", "confirmationCode")
-    if resp:
-        return resp
+_CONFIRM_SIGN_UP_ERRORS = {
+    "UserNotFoundException": _ERR_USER_NOT_FOUND,
+    "CodeMismatchException": _ERR_INVALID_CONFIRMATION_CODE,
+    "NotAuthorizedException": _ERR_ALREADY_CONFIRMED,
+}
 
-    username = body["username"]
-    code = body["confirmationCode"]
+
+def confirm_sign_up(body):
+    username = body.get("username")
+    code = body.get("confirmationCode")
+    if not username or not code:
+        return _missing_fields(body, "username", "confirmationCode")
+    if not _COGNITO_LIMITS["confirm_sign_up"].try_acquire():
+        return _ERR_RATE_LIMITED
 
     try:
-        cognito.confirm_sign_up(
+        _get_cognito().confirm_sign_up(
             ClientId=COGNITO_CLIENT_ID, Username=username, ConfirmationCode=code
         )
-        return _response(
-            200, {"success": True, "data": {"message": "User confirmed successfully"}}
-        )
+        # With PreventUserExistenceErrors, sign-ins before the account existed
+        # were rejected as incorrect credentials and cached
+        _FAILED_SIGN_INS.clear()
+        return _OK_USER_CONFIRMED
 
     except ClientError as e:
         code = e.response["Error"]["Code"]
-        print(f"Cognito confirm_sign_up error: {e}")
-        if code == "UserNotFoundException":
-            return _response(404, {"success": False, "error": "User not found"})
-        if code == "CodeMismatchException":
-            return _response(
-                400, {"success": False, "error": "Invalid confirmation code"}
-            )
-        if code == "NotAuthorizedException":
-            return _response(400, {"success": False, "error": "User already confirmed"})
-        return _response(400, {"success": False, "error": "Confirmation failed"})
+        logger.warning("Cognito confirm_sign_up error: %s", e)
+        return _CONFIRM_SIGN_UP_ERRORS.get(code, _ERR_CONFIRMATION_FAILED)
 
 
-def reset_password(body):
-    resp = require_fields(body, "email")
-    if resp:
-        return resp
+_RESET_PASSWORD_ERRORS = {
+    "UserNotFoundException": _ERR_EMAIL_NOT_FOUND,
+    "InvalidParameterException": _ERR_EMAIL_UNVERIFIED,
+}
 
-    email = body["email"]
+
+def reset_password(body):
+    email = body.get("email")
+    if not email:
+        return _missing_fields(body, "email")
+    if not _COGNITO_LIMITS["forgot_password"].try_acquire():
+        return _ERR_RATE_LIMITED
 
     try:
-        cognito.forgot_password(ClientId=COGNITO_CLIENT_ID, Username=email)
-        return _response(
-            200, {"success": True, "data": {"message": "Password reset initiated"}}
-        )
+        _get_cognito().forgot_password(ClientId=COGNITO_CLIENT_ID, Username=email)
+        return _OK_RESET_INITIATED
     except ClientError as e:
         code = e.response["Error"]["Code"]
-        print(f"Cognito reset_password error: {e}")
-        if code == "UserNotFoundException":
-            return _response(404, {"success": False, "error": "Email not found"})
-        if code == "InvalidParameterException":
-            return _response(
-                400,
-                {
-                    "success": False,
-                    "error": "Cannot reset password for unverified email",
-                },
-            )
-        return _response(400, {"success": False, "error": "Reset password failed"})
+        logger.warning("Cognito reset_password error: %s", e)
+        return _RESET_PASSWORD_ERRORS.get(code, _ERR_RESET_FAILED)
 
 
-def confirm_reset_password(body):
-    resp = require_fields(body, "email", "verificationCode", "password")
-    if resp:
-        return resp
+_CONFIRM_RESET_PASSWORD_ERRORS = {
+    "CodeMismatchException": _ERR_INVALID_VERIFICATION_CODE,
+    "UserNotFoundException": _ERR_EMAIL_NOT_FOUND,
+}
 
-    email = body["email"]
-    code = body["verificationCode"]
-    new_password = body["password"]
+
+def confirm_reset_password(body):
+    email = body.get("email")
+    code = body.get("verificationCode")
+    new_password = body.get("password")
+    if not email or not code or not new_password:
+        return _missing_fields(body, "email", "verificationCode", "password")
+    if not _COGNITO_LIMITS["confirm_forgot_password"].try_acquire():
+        return _ERR_RATE_LIMITED
 
     try:
-        cognito.confirm_forgot_password(
+        _get_cognito().confirm_forgot_password(
             ClientId=COGNITO_CLIENT_ID,
             Username=email,
             ConfirmationCode=code,
             Password=new_password,
         )
-        return _response(
-            200, {"success": True, "data": {"message": "Password reset confirmed"}}
-        )
+        # The new password may be one that was just rejected and cached
+        _FAILED_SIGN_INS.clear()
+        return _OK_RESET_CONFIRMED
     except ClientError as e:
         code = e.response["Error"]["Code"]
-        print(f"Cognito confirm_reset_password error: {e}")
-        if code == "CodeMismatchException":
-            return _response(
-                400, {"success": False, "error": "Invalid verification code"}
-            )
-        if code == "UserNotFoundException":
-            return _response(404, {"success": False, "error": "Email not found"})
-        return _response(
-            400, {"success": False, "error": "Password confirmation failed"}
+        logger.warning("Cognito confirm_reset_password error: %s", e)
+        return _CONFIRM_RESET_PASSWORD_ERRORS.get(
+            code, _ERR_RESET_CONFIRMATION_FAILED
         )
 
 
@@ -236,22 +422,33 @@ ROUTES = {
 
 def handler(event, context):
     """Main Lambda handler"""
-    print(f"Incoming event: {event}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Incoming event: %s", _loggable_event(event))
+
+    # Answer CORS preflight before any body parsing or Cognito work
+    if event.get("requestContext", {}).get("http", {}).get("method") == "OPTIONS":
+        return _CORS_PREFLIGHT
+
+    # Clients almost always send the canonical path, so try it before normalizing
+    path = event.get("rawPath", "")
+    route_handler = ROUTES.get(path)
+    if route_handler is None:
+        path = path.rstrip("/").lower()
+        route_handler = ROUTES.get(path)
+        if route_handler is None:
+            return _response(
+                404, {"success": False, "error": f"Unknown endpoint: {path}"}
+            )
 
-    path = event.get("rawPath", "").rstrip("/").lower()
     body = {}
     if "body" in event and event["body"]:
         try:
-            body = json.loads(event["body"])
-        except json.JSONDecodeError:
-            return _response(400, {"success": False, "error": "Invalid JSON body"})
+            body = _loads(event["body"])
+        except json.JSONDecodeError:  # orjson's error subclasses this too
+            return _ERR_INVALID_JSON
 
-    route_handler = ROUTES.get(path)
-    if route_handler:
-        try:
-            return route_handler(body)
-        except Exception as e:
-            print(f"Unhandled error in route {path}: {e}")
-            return _response(500, {"success": False, "error": "Internal server error"})
-    else:
-        return _response(404, {"success": False, "error": f"Unknown endpoint: {path}"})
+    try:
+        return route_handler(body)
+    except Exception:
+        logger.exception("Unhandled error in route %s", path)
+        return _ERR_INTERNAL
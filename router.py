@@ -1,12 +1,19 @@
-from handlers import hello
+import importlib
+
+# (method, path) -> handler module exposing handle(event, context).
+# Modules are imported on first use so a route never pays for another's deps.
+ROUTES = {
+    ("GET", "/hello"): "handlers.hello",
+}
 
 
 def route_request(event, context):
     path = event.get("rawPath") or event.get("path", "")
     method = event.get("requestContext", {}).get("http", {}).get("method", "GET")
 
-    if path == "/hello" and method == "GET":
-        return hello.handle(event, context)
+    module_name = ROUTES.get((method, path))
+    if module_name:
+        return importlib.import_module(module_name).handle(event, context)
     else:
         return {
             "statusCode": 404,
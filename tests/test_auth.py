@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from handlers.auth import auth
+
+
+class FakeCognito:
+    """Stand-in Cognito client for one user with PreventUserExistenceErrors on"""
+
+    def __init__(self, password):
+        self.password = password
+        self.exists = True
+        self.enabled = True
+        self.sign_in_calls = 0
+
+    def initiate_auth(self, **kwargs):
+        self.sign_in_calls += 1
+        if not self.exists:
+            raise _not_authorized("Incorrect username or password.")
+        if not self.enabled:
+            raise _not_authorized("User is disabled.")
+        if kwargs["AuthParameters"]["PASSWORD"] != self.password:
+            raise _not_authorized("Incorrect username or password.")
+        return {"AuthenticationResult": {"IdToken": "id"}}
+
+    def sign_up(self, **kwargs):
+        self.password = kwargs["Password"]
+        return {"UserConfirmed": False, "UserSub": "sub"}
+
+    def confirm_sign_up(self, **kwargs):
+        self.exists = True
+
+    def confirm_forgot_password(self, **kwargs):
+        self.password = kwargs["Password"]
+
+
+def _not_authorized(message):
+    return ClientError(
+        {"Error": {"Code": "NotAuthorizedException", "Message": message}},
+        "InitiateAuth",
+    )
+
+
+def _call(path, body):
+    return auth.handler({"rawPath": path, "body": json.dumps(body)}, None)
+
+
+def _sign_in(password):
+    return _call("/auth/sign-in", {"username": "u", "password": password})
+
+
+@pytest.fixture
+def cognito(monkeypatch):
+    client = FakeCognito(password="old")
+    monkeypatch.setattr(auth, "_get_cognito", lambda: client)
+    monkeypatch.setattr(
+        auth,
+        "_COGNITO_LIMITS",
+        {
+            op: auth._TokenBucket(rate=bucket.rate, capacity=bucket.capacity)
+            for op, bucket in auth._COGNITO_LIMITS.items()
+        },
+    )
+    auth._FAILED_SIGN_INS.clear()
+    yield client
+    auth._FAILED_SIGN_INS.clear()
+
+
+def test_repeated_bad_sign_in_skips_cognito(cognito):
+    assert _sign_in("x")["statusCode"] == 401
+    assert _sign_in("x")["statusCode"] == 401
+    assert cognito.sign_in_calls == 1
+
+
+def test_reset_to_rejected_password_then_sign_in(cognito):
+    assert _sign_in("x")["statusCode"] == 401
+
+    resp = _call(
+        "/auth/confirm-reset-password",
+        {"email": "u", "verificationCode": "123456", "password": "x"},
+    )
+    assert resp["statusCode"] == 200
+
+    assert _sign_in("x")["statusCode"] == 200
+    assert cognito.sign_in_calls == 2
+
+
+def test_disabled_user_is_not_cached(cognito):
+    cognito.enabled = False
+    assert _sign_in("old")["statusCode"] == 401
+
+    cognito.enabled = True
+    assert _sign_in("old")["statusCode"] == 200
+    assert cognito.sign_in_calls == 2
+
+
+def test_sign_in_before_account_exists_then_sign_up(cognito):
+    cognito.exists = False
+    assert _sign_in("x")["statusCode"] == 401
+
+    resp = _call(
+        "/auth/sign-up",
+        {"email": "u", "password": "x", "firstName": "F", "lastName": "L"},
+    )
+    assert resp["statusCode"] == 200
+    resp = _call("/auth/confirm-sign-up", {"username": "u", "confirmationCode": "1"})
+    assert resp["statusCode"] == 200
+
+    assert _sign_in("x")["statusCode"] == 200
+    assert cognito.sign_in_calls == 2